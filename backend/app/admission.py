@@ -0,0 +1,177 @@
+# backend/app/admission.py
+"""Admission control for the LLM/TTS-backed endpoints.
+
+- per-endpoint concurrency limit with a bounded wait queue; a full queue or a
+  wait longer than the timeout answers 503 + Retry-After right away
+- token-bucket rate limits per authenticated user and per client IP (429)
+
+It runs on the event loop before the request reaches the threadpool, so a slow
+upstream only ever ties up `max_concurrent` threads and auth stays responsive.
+"""
+import os, asyncio, json, math, time
+from collections import OrderedDict, deque
+from .metrics import Counter, Gauge, Histogram
+from .security import decode_token
+
+
+def _env_int(name, default):   return int(os.getenv(name, str(default)))
+def _env_float(name, default): return float(os.getenv(name, str(default)))
+
+RATE_USER_PER_MIN  = _env_float("RATE_USER_PER_MIN", 30)
+RATE_USER_BURST    = _env_float("RATE_USER_BURST", 10)
+RATE_IP_PER_MIN    = _env_float("RATE_IP_PER_MIN", 60)
+RATE_IP_BURST      = _env_float("RATE_IP_BURST", 20)
+RATE_MAX_KEYS      = _env_int("RATE_MAX_KEYS", 10000)     # LRU bound on tracked users/IPs
+OVERLOAD_RETRY_S   = _env_int("OVERLOAD_RETRY_AFTER", 2)
+
+QUEUE_DEPTH = Gauge("librarian_admission_queue_depth", "Requests waiting for a slot.", ["endpoint"])
+IN_FLIGHT   = Gauge("librarian_admission_in_flight", "Requests holding a slot.", ["endpoint"])
+REJECTED    = Counter("librarian_admission_rejected_total", "Requests shed by admission control.", ["endpoint", "reason"])
+QUEUE_WAIT  = Histogram("librarian_admission_wait_seconds", "Time spent waiting for a slot.", ["endpoint"])
+
+
+class Limiter:
+    """At most `max_concurrent` in flight, at most `max_queue` waiting (event-loop only, no locks)."""
+
+    def __init__(self, endpoint: str, max_concurrent: int, max_queue: int, timeout: float):
+        self.endpoint, self.max_concurrent = endpoint, max_concurrent
+        self.max_queue, self.timeout = max_queue, timeout
+        self.in_flight = 0
+        self._waiters = deque()   # futures, FIFO; release() hands its slot to the first one
+
+    def _publish(self):
+        QUEUE_DEPTH.set(len(self._waiters), endpoint=self.endpoint)
+        IN_FLIGHT.set(self.in_flight, endpoint=self.endpoint)
+
+    async def acquire(self):
+        """Return None when admitted, else the rejection reason."""
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            self._publish()
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self._publish()
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(fut, self.timeout)
+            return None
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled():
+                return None   # release() handed us the slot in the same loop tick (3.12+ wait_for)
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()   # the slot was handed to us just as the client went away
+            raise
+        finally:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+            QUEUE_WAIT.observe(time.perf_counter() - t0, endpoint=self.endpoint)
+            self._publish()
+
+    def release(self):
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)   # slot moves to the waiter; in_flight unchanged
+                self._publish()
+                return
+        self.in_flight -= 1
+        self._publish()
+
+
+class TokenBuckets:
+    """One bucket per key, refilled at `per_min` tokens/minute up to `burst`."""
+
+    def __init__(self, per_min: float, burst: float, max_keys: int = RATE_MAX_KEYS):
+        self.rate, self.burst, self.max_keys = per_min / 60.0, burst, max_keys
+        self._buckets = OrderedDict()   # key -> (tokens, last_ts)
+
+    def take(self, key: str) -> float:
+        """Consume one token; returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        tokens, last = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        wait = 0.0
+        if tokens >= 1.0:
+            tokens -= 1.0
+        else:
+            wait = (1.0 - tokens) / self.rate if self.rate > 0 else float(OVERLOAD_RETRY_S)
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+def limits_from_env():
+    out = {}
+    for path, prefix, conc, queue, timeout in (("/ask", "ASK", 8, 16, 10.0), ("/tts", "TTS", 4, 8, 10.0)):
+        out[path] = Limiter(
+            path,
+            _env_int(f"{prefix}_MAX_CONCURRENCY", conc),
+            _env_int(f"{prefix}_MAX_QUEUE", queue),
+            _env_float(f"{prefix}_QUEUE_TIMEOUT", timeout),
+        )
+    return out
+
+
+def _user_key(scope):
+    for k, v in scope.get("headers", []):
+        if k == b"authorization":
+            val = v.decode("latin-1")
+            if val.lower().startswith("bearer "):
+                try:
+                    return decode_token(val.split(" ", 1)[1]).get("sub")
+                except Exception:
+                    return None
+    return None
+
+
+async def _reject(send, status: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+    ]})
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware; only POSTs to the limited paths are affected."""
+
+    def __init__(self, app, limits=None):
+        self.app = app
+        self.limits = limits if limits is not None else limits_from_env()
+        self.user_buckets = TokenBuckets(RATE_USER_PER_MIN, RATE_USER_BURST)
+        self.ip_buckets = TokenBuckets(RATE_IP_PER_MIN, RATE_IP_BURST)
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limiter is None or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+
+        user = _user_key(scope)
+        if user:
+            wait = self.user_buckets.take(user)
+            if wait:
+                REJECTED.inc(endpoint=limiter.endpoint, reason="user_rate")
+                return await _reject(send, 429, "Too many requests. Slow down a little.", wait)
+        ip = (scope.get("client") or ("unknown",))[0]
+        wait = self.ip_buckets.take(ip)
+        if wait:
+            REJECTED.inc(endpoint=limiter.endpoint, reason="ip_rate")
+            return await _reject(send, 429, "Too many requests. Slow down a little.", wait)
+
+        reason = await limiter.acquire()
+        if reason:
+            REJECTED.inc(endpoint=limiter.endpoint, reason=reason)
+            return await _reject(send, 503, "The librarian is busy right now. Please retry shortly.", OVERLOAD_RETRY_S)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -4,7 +4,7 @@ from sqlmodel import Session, select
 from datetime import datetime, timedelta
 import hashlib, os, random
 
-from .models import init_db, get_session, User, VerificationCode, CodePurpose
+from .models import get_session, User, VerificationCode, CodePurpose
 from .security import (
     hash_password, verify_password,
     create_access_token, create_refresh_token, decode_token
@@ -115,10 +115,6 @@ class ChangePwConfirm(BaseModel):
 
 
 # ---------- routes ----------
-@router.on_event("startup")
-def _startup():
-    init_db()
-
 @router.post("/register")
 def register(req: RegisterReq, sess: Session = Depends(get_session)):
     if len(req.password) < 8:
@@ -200,6 +196,15 @@ def get_current_user(
         raise HTTPException(401, "User not found")
     return user
 
+def optional_user_email(authorization: str | None = Header(default=None)) -> str | None:
+    """Email from a valid bearer token, or None. No DB lookup (used by the public /ask)."""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return decode_token(authorization.split(" ", 1)[1]).get("sub")
+    except Exception:
+        return None
+
 @router.post("/change-password/request")
 def change_pw_request(user: User = Depends(get_current_user), sess: Session = Depends(get_session)):
     code = create_code(sess, user, CodePurpose.CHPASS)
@@ -0,0 +1,115 @@
+# backend/app/catalog.py
+"""Versioned "books" collections with an atomic pointer to the active one.
+
+Ingestion builds `books_v{n}` next to the live version, validates it, then
+swaps ACTIVE_FILE with os.replace (atomic on POSIX and Windows). Workers stat
+the pointer on each lookup and reopen the collection when it changes, so a
+re-index needs no restart. Without a pointer file we fall back to the legacy
+unversioned "books" collection.
+"""
+import os, json, re, threading, time
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+APP_DIR       = Path(__file__).resolve().parent
+CHROMA_DIR    = os.getenv("CHROMA_DIR", str(APP_DIR / "data" / "chroma"))
+ACTIVE_FILE   = Path(CHROMA_DIR) / "ACTIVE.json"
+LEGACY_NAME   = "books"
+KEEP_VERSIONS = int(os.getenv("INDEX_KEEP_VERSIONS", "2"))   # active + previous, for in-flight queries
+
+_VERSION = re.compile(r"^books_v(\d+)$")
+
+_chroma = None
+_lock = threading.Lock()
+_active = {"stamp": None, "name": None, "col": None}
+
+
+def chroma_client():
+    global _chroma
+    if _chroma is None:
+        import chromadb
+        from chromadb.config import Settings
+        _chroma = chromadb.PersistentClient(path=CHROMA_DIR, settings=Settings())
+    return _chroma
+
+
+# ---------- pointer ----------
+def read_pointer():
+    try:
+        with open(ACTIVE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def write_pointer(name: str, count: int):
+    ACTIVE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ACTIVE_FILE.with_suffix(f".tmp{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"name": name, "count": count, "published_at": time.time()}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, ACTIVE_FILE)
+
+def _stamp():
+    try:
+        st = os.stat(ACTIVE_FILE)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except FileNotFoundError:
+        return None
+
+
+# ---------- readers ----------
+def active_collection():
+    """The collection the pointer names; reopened whenever the pointer file changes."""
+    stamp = _stamp()
+    with _lock:
+        if _active["col"] is not None and _active["stamp"] == stamp:
+            return _active["col"]
+    ptr = read_pointer() if stamp else None
+    name = ptr["name"] if ptr else LEGACY_NAME
+    try:
+        col = chroma_client().get_collection(name)
+    except Exception as e:
+        raise RuntimeError(f"No '{name}' collection in {CHROMA_DIR}. Did you run ingestion?") from e
+    with _lock:
+        _active.update(stamp=stamp, name=name, col=col)
+    return col
+
+def invalidate():
+    """Forget the cached handle (e.g. the collection was garbage-collected under us)."""
+    with _lock:
+        _active.update(stamp=None, name=None, col=None)
+
+
+# ---------- ingestion side ----------
+def collection_names():
+    # chromadb < 0.6 returns Collection objects, newer versions return names
+    return [getattr(c, "name", c) for c in chroma_client().list_collections()]
+
+def versions():
+    out = []
+    for n in collection_names():
+        m = _VERSION.match(n)
+        if m:
+            out.append(int(m.group(1)))
+    return sorted(out)
+
+def next_name() -> str:
+    vs = versions()
+    return f"books_v{(vs[-1] + 1) if vs else 1}"
+
+def gc(keep: int = KEEP_VERSIONS):
+    """Drop all but the newest `keep` versions (never the active one) and the legacy collection."""
+    ptr = read_pointer()
+    if not ptr:
+        return []
+    active = ptr["name"]
+    keep_names = {active} | {f"books_v{v}" for v in versions()[-keep:]}
+    dropped = []
+    for n in collection_names():
+        if (n == LEGACY_NAME or _VERSION.match(n)) and n not in keep_names:
+            chroma_client().delete_collection(n)
+            dropped.append(n)
+    return dropped
@@ -1,7 +1,7 @@
 # backend/app/emailer.py
 import os, asyncio, ssl
 from email.message import EmailMessage
-import aiosmtplib
+from .metrics import span
 
 SMTP_HOST = os.getenv("SMTP_HOST", "")
 SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
@@ -21,6 +21,11 @@ def _build_msg(to: str, subject: str, html: str) -> EmailMessage:
     return msg
 
 async def _send_async(to: str, subject: str, html: str):
+    with span("email.send"):
+        await _deliver(to, subject, html)
+
+async def _deliver(to: str, subject: str, html: str):
+    import aiosmtplib   # lazy: only needed when an email actually goes out
     # Dev fallback: no SMTP configured → just print and exit
     if not SMTP_HOST:
         print(f"\n[DEV EMAIL] To: {to}\nSubject: {subject}\n{html}\n")
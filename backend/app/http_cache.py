@@ -0,0 +1,67 @@
+# backend/app/http_cache.py
+"""HTTP caching helpers: weak ETags for per-user JSON, compression, static cache headers."""
+import os, re
+from fastapi import Request, Response
+from fastapi.staticfiles import StaticFiles
+from starlette.middleware.gzip import GZipMiddleware
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))   # bytes; smaller bodies go out as-is
+STATIC_MAX_AGE    = int(os.getenv("STATIC_MAX_AGE", str(60 * 60 * 24 * 365)))
+
+# app.3f9a1c2e.js, styles.0a1b2c3d4e.css ... : content-hashed names never change content
+_HASHED = re.compile(r"\.[0-9a-f]{8,}\.[a-z0-9]+$", re.I)
+_VERSION_QS = re.compile(rb"(?:^|&)v=")   # or cache-busted explicitly: auth.js?v=3
+
+
+# ---------- conditional GET ----------
+def user_etag(user_id: int, version: int) -> str:
+    return f'W/"u{user_id}-v{version}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    inm = request.headers.get("if-none-match")
+    if not inm:
+        return False
+    tags = [t.strip() for t in inm.split(",")]
+    return "*" in tags or etag in tags or etag[2:] in tags   # weak comparison
+
+def cache_headers(etag: str) -> dict:
+    # private + no-cache: browsers keep it but revalidate every time; Vary so users never share entries
+    return {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+# ---------- compression ----------
+def _compressor(app):
+    try:   # optional: pip install brotli-asgi (serves br, falls back to gzip)
+        from brotli_asgi import BrotliMiddleware
+        return BrotliMiddleware(app, minimum_size=COMPRESS_MIN_SIZE)
+    except ImportError:
+        return GZipMiddleware(app, minimum_size=COMPRESS_MIN_SIZE)
+
+class CompressionMiddleware:
+    """br/gzip above COMPRESS_MIN_SIZE, except for paths that are already compressed (mp3)."""
+
+    def __init__(self, app, skip_paths=("/tts",)):
+        self.app = app
+        self.compressed = _compressor(app)
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] not in self.skip_paths:
+            return await self.compressed(scope, receive, send)
+        return await self.app(scope, receive, send)
+
+
+# ---------- static files ----------
+class CachedStaticFiles(StaticFiles):
+    """Hashed assets (or ?v=... URLs) are immutable for a year; everything else revalidates via ETag."""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        resp = super().file_response(full_path, stat_result, scope, status_code)
+        versioned = _HASHED.search(os.path.basename(str(full_path))) or _VERSION_QS.search(scope.get("query_string", b""))
+        resp.headers["Cache-Control"] = (
+            f"public, max-age={STATIC_MAX_AGE}, immutable" if versioned else "no-cache"
+        )
+        return resp
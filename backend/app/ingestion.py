@@ -1,19 +1,17 @@
 import os, json
 from pathlib import Path
 from dotenv import load_dotenv
-from openai import OpenAI
-import chromadb
-from chromadb.config import Settings
+from . import catalog
 
 load_dotenv()
 
 APP_DIR   = Path(__file__).resolve().parent              # .../backend/app
 DATA_DIR  = APP_DIR / "data"                             # single source of truth
-JSONL_FILE = DATA_DIR / "books.jsonl"
-CHROMA_DIR = os.getenv("CHROMA_DIR", str(DATA_DIR / "chroma"))
+JSONL_FILE = Path(os.getenv("BOOKS_JSONL", str(DATA_DIR / "books.jsonl")))
+CHROMA_DIR = catalog.CHROMA_DIR
 EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-3-small")
-
-client = OpenAI()
+EMBED_BATCH = int(os.getenv("EMBED_BATCH", "512"))
+ADD_BATCH   = int(os.getenv("CHROMA_ADD_BATCH", "1000"))
 
 def load_books():
     if not JSONL_FILE.exists():
@@ -45,29 +43,58 @@ def load_books():
     return items
 
 def embed(texts):
-    resp = client.embeddings.create(model=EMBED_MODEL, input=texts)
-    return [d.embedding for d in resp.data]
+    from openai import OpenAI
+    client = OpenAI()
+    out = []
+    for i in range(0, len(texts), EMBED_BATCH):
+        resp = client.embeddings.create(model=EMBED_MODEL, input=texts[i:i + EMBED_BATCH])
+        out.extend(d.embedding for d in resp.data)
+    return out
+
+def validate(col, books, embs, samples: int = 5):
+    """The new version must hold every book, and a few books must retrieve themselves first."""
+    if col.count() != len(books):
+        return f"expected {len(books)} records, found {col.count()}"
+    step = max(1, len(books) // samples)
+    picks = list(range(0, len(books), step))[:samples]
+    if not picks:
+        return None
+    res = col.query(query_embeddings=[embs[i] for i in picks], n_results=1, include=["metadatas"])
+    for i, metas in zip(picks, res["metadatas"]):
+        if not metas or metas[0].get("title") != books[i]["title"]:
+            return f"self-lookup failed for '{books[i]['title']}'"
+    return None
 
 def main():
     books = load_books()
     embed_texts = [f"{b['title']}\n{b['author']}\n{b['short_summary']}\n{b['difficulty']}" for b in books]
     embs = embed(embed_texts)
 
-    chroma = chromadb.PersistentClient(path=CHROMA_DIR, settings=Settings())
-    try: chroma.delete_collection("books")
-    except Exception: pass
-    col = chroma.create_collection(name="books", metadata={"hnsw:space":"cosine"})
+    # Build the next version next to the live one; /ask keeps reading the active pointer meanwhile.
+    name = catalog.next_name()
+    col = catalog.chroma_client().create_collection(name=name, metadata={"hnsw:space":"cosine"})
+    for i in range(0, len(books), ADD_BATCH):
+        part = books[i:i + ADD_BATCH]
+        col.add(
+            ids=[f"book_{j}" for j in range(i, i + len(part))],
+            documents=[b["full_summary"] for b in part],
+            metadatas=[{
+                "title": b["title"], "author": b["author"], "difficulty": b["difficulty"],
+                "short_summary": b["short_summary"],
+            } for b in part],
+            embeddings=embs[i:i + len(part)],
+        )
+
+    problem = validate(col, books, embs)
+    if problem:
+        catalog.chroma_client().delete_collection(name)
+        raise SystemExit(f"[INGESTION] Validation of {name} failed: {problem}. Active version unchanged.")
 
-    col.add(
-        ids=[f"book_{i}" for i in range(len(books))],
-        documents=[b["full_summary"] for b in books],
-        metadatas=[{
-            "title": b["title"], "author": b["author"], "difficulty": b["difficulty"],
-            "short_summary": b["short_summary"],
-        } for b in books],
-        embeddings=embs,
-    )
-    print(f"[INGESTION] Indexed {len(books)} books into {CHROMA_DIR}")
+    catalog.write_pointer(name, len(books))
+    print(f"[INGESTION] Indexed {len(books)} books into {name} ({CHROMA_DIR}); now active")
+    dropped = catalog.gc()
+    if dropped:
+        print(f"[INGESTION] Garbage-collected old versions: {', '.join(dropped)}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,235 @@
+# backend/app/intent.py
+import os, sys, json, math, random, re, threading, zlib
+from pathlib import Path
+
+APP_DIR     = Path(__file__).resolve().parent
+INTENT_FILE = APP_DIR / "data" / "intent.jsonl"
+BOOKS_FILE  = Path(os.getenv("BOOKS_JSONL", str(APP_DIR / "data" / "books.jsonl")))   # same catalog as ingestion
+
+N_FEATURES  = 1 << 18
+EPOCHS      = int(os.getenv("INTENT_EPOCHS", "30"))
+LR          = float(os.getenv("INTENT_LR", "0.5"))
+L2          = float(os.getenv("INTENT_L2", "1e-4"))
+
+# p(book) <= OFF_TOPIC_MAX -> answer "off-topic" locally, no embedding call
+# p(book) >= BOOK_MIN      -> treat as a book question, skip the distance gate
+# anything in between      -> uncertain, fall back to the retrieval distance gate
+# Defaults come from `python -m app.intent --tune` (out-of-fold scores of intent.jsonl).
+OFF_TOPIC_MAX = float(os.getenv("INTENT_OFF_TOPIC_MAX", "0.14"))
+BOOK_MIN      = float(os.getenv("INTENT_BOOK_MIN", "0.96"))
+# A BOOK verdict only skips the distance gate when this is set; until the classifier is
+# calibrated on real traffic the cheap keyword/catalog-title/distance guard stays on.
+TRUST_BOOK    = os.getenv("INTENT_TRUST_BOOK", "0") == "1"
+
+BOOK, OFF_TOPIC, UNSURE = "book", "off_topic", "unsure"
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_model = None   # (weights: dict[int, float], bias: float)
+_titles = None  # normalised catalog titles
+_lock = threading.Lock()
+
+# catalog titles become positives through these, so title questions never look off-topic
+TITLE_TEMPLATES = [
+    "{title}", "What is {title}?", "Tell me about {title}", "Is {title} good?",
+    "Who wrote {title}?", "Something like {title}", "I want to read {title}",
+]
+
+def _norm(text: str) -> str:
+    return " ".join(_TOKEN.findall((text or "").lower()))
+
+def _features(text: str) -> dict:
+    """Hashed word unigrams/bigrams + char trigrams, L2-normalised."""
+    words = _TOKEN.findall((text or "").lower())
+    grams = [f"w:{w}" for w in words]
+    grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"<{w}>"
+        grams += [f"c:{padded[i:i+3]}" for i in range(len(padded) - 2)]
+    feats = {}
+    for g in grams:
+        h = zlib.crc32(g.encode("utf-8")) % N_FEATURES   # crc32: stable across processes
+        feats[h] = feats.get(h, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in feats.values())) or 1.0
+    return {h: v / norm for h, v in feats.items()}
+
+def _sigmoid(z: float) -> float:
+    if z < -30: return 0.0
+    if z > 30:  return 1.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+def load_labelled():
+    """Hand-labelled (text, y, weight) triples from intent.jsonl."""
+    items = []
+    with open(INTENT_FILE, "r", encoding="utf-8-sig") as f:
+        for raw in f:
+            s = raw.strip()
+            if not s or s.startswith("#"):
+                continue
+            obj = json.loads(s)
+            items.append((obj["text"], 1.0 if obj["label"] == BOOK else 0.0, 1.0))
+    return items
+
+def load_examples():
+    items = load_labelled()
+    return items + templated_examples(items)
+
+def templated_examples(items):
+    """Catalog-title positives, together weighing as much as the hand-labelled positives."""
+    templated = [t.format(title=title) for title in load_titles() for t in TITLE_TEMPLATES]
+    if not templated:
+        return []
+    n_pos = sum(1 for _, y, _ in items if y == 1.0) or 1
+    w = min(1.0, n_pos / len(templated))
+    return [(t, 1.0, w) for t in templated]
+
+def _balanced(examples):
+    """Scale the off-topic weights so both classes carry the same total weight."""
+    pos = sum(w for _, y, w in examples if y == 1.0)
+    neg = sum(w for _, y, w in examples if y == 0.0) or 1.0
+    return [(t, y, w * pos / neg if y == 0.0 else w) for t, y, w in examples]
+
+def load_titles():
+    """Catalog titles from books.jsonl (empty if the catalog file is missing)."""
+    titles = []
+    try:
+        with open(BOOKS_FILE, "r", encoding="utf-8-sig") as f:
+            for raw in f:
+                s = raw.strip()
+                if not s or s.startswith("#") or s.startswith("//"):
+                    continue
+                try:
+                    t = (json.loads(s).get("title") or "").strip()
+                except json.JSONDecodeError:
+                    continue
+                if t:
+                    titles.append(t)
+    except FileNotFoundError:
+        pass
+    return titles
+
+def _catalog_titles():
+    global _titles
+    if _titles is None:
+        _titles = {n for n in (_norm(t) for t in load_titles()) if len(n) >= 3}
+    return _titles
+
+def mentions_catalog_title(text: str) -> bool:
+    q = f" {_norm(text)} "
+    return any(f" {t} " in q for t in _catalog_titles())
+
+def train(examples):
+    """Plain SGD logistic regression over (text, label, weight); deterministic (fixed shuffle seed)."""
+    data = [(_features(t), y, sw) for t, y, sw in _balanced(examples)]
+    weights, bias = {}, 0.0
+    rng = random.Random(13)
+    for epoch in range(EPOCHS):
+        rng.shuffle(data)
+        lr = LR / (1.0 + 0.1 * epoch)
+        for x, y, sw in data:
+            z = bias + sum(weights.get(h, 0.0) * v for h, v in x.items())
+            g = sw * (_sigmoid(z) - y)
+            for h, v in x.items():
+                w = weights.get(h, 0.0)
+                weights[h] = w - lr * (g * v + L2 * w)
+            bias -= lr * g
+    return weights, bias
+
+def _get_model():
+    """Train once, on first use (or from the startup warmup); concurrent callers wait for it."""
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                _model = train(load_examples())
+    return _model
+
+def warm():
+    _get_model()
+    _catalog_titles()
+
+def _probability(model, text: str) -> float:
+    weights, bias = model
+    x = _features(text)
+    return _sigmoid(bias + sum(weights.get(h, 0.0) * v for h, v in x.items()))
+
+def book_probability(text: str) -> float:
+    return _probability(_get_model(), text)
+
+def classify(text: str):
+    """Return (label, p_book) where label is BOOK, OFF_TOPIC or UNSURE."""
+    p = book_probability(text)
+    if p <= OFF_TOPIC_MAX:
+        # never short-circuit a query naming a catalog book; let retrieval decide
+        return (UNSURE if mentions_catalog_title(text) else OFF_TOPIC), p
+    if p >= BOOK_MIN:
+        return BOOK, p
+    return UNSURE, p
+
+# chit-chat that must never be treated as a book question, and queries that must be
+# rejected locally (no embedding call); none of these are in intent.jsonl
+NOT_BOOK_PROBES = [
+    "good morning", "good evening", "hello, good morning!", "tell me something", "no", "yes please",
+    "thanks a bunch", "hey, how are you doing?", "what's up", "nice one", "tell me about your weekend",
+    "what is the capital of Spain?", "who won the game last night?",
+]
+OFF_TOPIC_PROBES = [
+    "what is the weather today", "is it going to snow tomorrow?", "how do I cook rice?",
+    "hi", "tell me a joke", "how are you today?",
+]
+
+def check():
+    """Catalog titles and title questions must never be classified OFF_TOPIC; the probes
+    above must never be BOOK, and OFF_TOPIC_PROBES must be OFF_TOPIC. Returns failures."""
+    failures = []
+    for title in load_titles():
+        for q in [title] + [t.format(title=title) for t in TITLE_TEMPLATES] + [f"is {title} worth it"]:
+            label, p = classify(q)
+            if label == OFF_TOPIC:
+                failures.append((q, label, round(p, 3)))
+    for q in NOT_BOOK_PROBES + OFF_TOPIC_PROBES:
+        label, p = classify(q)
+        if label == BOOK or (q in OFF_TOPIC_PROBES and label != OFF_TOPIC):
+            failures.append((q, label, round(p, 3)))
+    return failures
+
+def cross_validate(folds: int = 5):
+    """Out-of-fold (p_book, y, text) for every hand-labelled example; folds split by text hash."""
+    labelled = load_labelled()
+    out = []
+    for k in range(folds):
+        held = [e for e in labelled if zlib.crc32(e[0].encode("utf-8")) % folds == k]
+        rest = [e for e in labelled if zlib.crc32(e[0].encode("utf-8")) % folds != k]
+        model = train(rest + templated_examples(rest))
+        out += [(_probability(model, t), y, t) for t, y, _ in held]
+    return out
+
+def tune(folds: int = 5, margin: float = 0.02):
+    """Thresholds with no held-out mistakes: OFF_TOPIC_MAX under every book question,
+    BOOK_MIN over every off-topic one. Returns (off_topic_max, book_min, out_of_fold)."""
+    oof = cross_validate(folds)
+    books = [p for p, y, _ in oof if y == 1.0]
+    off = [p for p, y, _ in oof if y == 0.0]
+    off_topic_max = max(0.0, min(books) - margin)
+    book_min = min(0.99, max(off) + margin)
+    return round(off_topic_max, 2), round(book_min, 2), oof
+
+if __name__ == "__main__":
+    # python -m app.intent          -> sanity check against the current catalog and probes
+    # python -m app.intent --tune   -> suggest thresholds from a held-out (k-fold) split
+    if "--tune" in sys.argv:
+        lo, hi, oof = tune()
+        n_off = sum(1 for _, y, _ in oof if y == 0.0)
+        local = sum(1 for p, y, _ in oof if y == 0.0 and p <= lo)
+        print(f"[INTENT] INTENT_OFF_TOPIC_MAX={lo}  ({local}/{n_off} held-out off-topic rejected locally)")
+        print(f"[INTENT] INTENT_BOOK_MIN={hi}")
+        for p, y, t in sorted(oof, reverse=True):
+            if y == 0.0 and p >= 0.5:
+                print(f"[INTENT] off-topic scored as book: {t!r} (p={p:.3f})")
+        sys.exit(0)
+    bad = check()
+    for q, label, p in bad:
+        print(f"[INTENT] {label} for {q!r} (p={p})")
+    n = len(load_titles())
+    print(f"[INTENT] {n} catalog titles and {len(NOT_BOOK_PROBES) + len(OFF_TOPIC_PROBES)} probes checked, "
+          f"{len(bad)} failures")
+    sys.exit(1 if bad else 0)
@@ -1,20 +1,34 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse, RedirectResponse, PlainTextResponse, JSONResponse
 from pydantic import BaseModel
 from pathlib import Path
+from contextlib import asynccontextmanager
 import json
 import os
 from fastapi import HTTPException
-from .rag import retrieve, chat_recommendation, looks_like_book_query
+from .rag import retrieve, chat_recommendation, pick_candidate, looks_like_book_query, RECOMMEND_MODE
+from .intent import classify, mentions_catalog_title, BOOK, OFF_TOPIC, TRUST_BOOK
 from .tools import get_summary_by_title
 from .profanity import is_clean
 from .tts import text_to_speech_mp3
-from .auth import router as auth_router
+from .auth import router as auth_router, optional_user_email
+from .taste import profile_for
 from .profile import router as me_router
+from .metrics import MetricsMiddleware, span, render as render_metrics
+from .admission import AdmissionMiddleware
+from .http_cache import CompressionMiddleware, CachedStaticFiles
+from . import warmup
 
-app = FastAPI(title="Smart Librarian")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup.start()   # catalog store, caches and DB engine, in parallel and off the accept path
+    yield
+
+app = FastAPI(title="Smart Librarian", lifespan=lifespan)
+
+# ---- Admission control for /ask and /tts (inside CORS, so 429/503 carry CORS headers) ----
+app.add_middleware(AdmissionMiddleware)
 
 # ---- CORS ----
 ALLOWED_ORIGINS = [
@@ -30,6 +44,12 @@ app.add_middleware(
     allow_credentials=True,
 )
 
+# ---- br/gzip for JSON and the static UI ----
+app.add_middleware(CompressionMiddleware)
+
+# ---- Metrics / Server-Timing (outermost, so it also times CORS) ----
+app.add_middleware(MetricsMiddleware)
+
 # ---- Routers ----
 app.include_router(me_router)
 app.include_router(auth_router)
@@ -37,7 +57,7 @@ app.include_router(auth_router)
 # ---- Serve static frontend at /ui ----
 FRONTEND_DIR = Path(__file__).resolve().parents[2] / "frontend"
 if FRONTEND_DIR.exists():
-    app.mount("/ui", StaticFiles(directory=str(FRONTEND_DIR), html=True), name="ui")
+    app.mount("/ui", CachedStaticFiles(directory=str(FRONTEND_DIR), html=True), name="ui")
 
 @app.get("/")
 def root():
@@ -53,34 +73,71 @@ class TTSReq(BaseModel):
     text: str
     lang: str | None = "en"   # default English
 
+OFF_TOPIC_MESSAGE = (
+    "I’m your book recommender and your request doesn’t look like a book question. "
+    "Try something like:\n• Recommend me a dystopian novel about surveillance\n"
+    "• A beginner-friendly fantasy adventure\n• A classic romance with sharp social commentary"
+)
+
 # ---- Health ----
 @app.get("/health")
 def health():
     return {"ok": True}
 
+# ---- Readiness (warmup finished) ----
+@app.get("/ready")
+def ready():
+    st = warmup.status()
+    return JSONResponse(st, status_code=200 if warmup.is_ready() else 503)
+
+# ---- Metrics (Prometheus text format) ----
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # ---- Ask (RAG + Tool) ----
 @app.post("/ask")
-def ask(req: AskReq):
-    if not is_clean(req.query):
+def ask(req: AskReq, email: str | None = Depends(optional_user_email)):
+    with span("profanity"):
+        clean = is_clean(req.query)
+    if not clean:
         return {"message": "Please rephrase without inappropriate language."}
 
+    # Local intent gate: clearly off-topic queries never reach the embedding API
+    with span("intent"):
+        intent, _p_book = classify(req.query)
+    if intent == OFF_TOPIC:
+        return {"message": OFF_TOPIC_MESSAGE}
+
     # Retrieve + confidence
-    candidates, best_dist = retrieve(req.query, k=5)
+    with span("taste.profile"):
+        profile = profile_for(email)   # cached; None for anonymous users
+    candidates, best_dist = retrieve(req.query, k=5, profile=profile)
 
-    # Intent + quality gate
+    # Quality gate; a BOOK verdict alone only skips it with INTENT_TRUST_BOOK=1
     MAX_DIST = float(os.getenv("RETRIEVAL_MAX_DISTANCE", "0.45"))  # tune if needed
-    if (not looks_like_book_query(req.query)) and (best_dist > MAX_DIST):
-        return {
-            "message": (
-                "I’m your book recommender and your request doesn’t look like a book question. "
-                "Try something like:\n• Recommend me a dystopian novel about surveillance\n"
-                "• A beginner-friendly fantasy adventure\n• A classic romance with sharp social commentary"
-            )
-        }
+    trusted = (intent == BOOK and TRUST_BOOK) or looks_like_book_query(req.query) or mentions_catalog_title(req.query)
+    if (not trusted) and (best_dist > MAX_DIST):
+        return {"message": OFF_TOPIC_MESSAGE}
 
     if not candidates:
         raise HTTPException(status_code=404, detail="No matches found")
 
+    if RECOMMEND_MODE == "structured":
+        # one structured call; the chosen candidate is already in hand, no second lookup
+        idx = pick_candidate(req.query, candidates)
+        top = candidates[idx]
+        return {
+            "recommended_title": top["title"],
+            "author": top["author"],
+            "difficulty": top["difficulty"],
+            "detailed_summary": top["doc"],
+            "alternatives": [
+                {"title": c["title"], "author": c["author"], "difficulty": c["difficulty"]}
+                for i, c in enumerate(candidates[:4]) if i != idx
+            ][:3],
+        }
+
     llm = chat_recommendation(req.query, candidates)
     choice = llm.choices[0]
     tool_calls = getattr(choice.message, "tool_calls", None) or []
@@ -0,0 +1,176 @@
+# backend/app/metrics.py
+"""Tiny in-process metrics: stage spans, Prometheus text output, Server-Timing.
+
+No external dependency; every update is a dict lookup plus a lock, so it is
+cheap enough to leave on in production.
+"""
+import os, threading, contextvars
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+
+# seconds; covers a cache hit up to a slow chat completion
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+_stages = contextvars.ContextVar("stages", default=None)   # per-request [(stage, seconds)]
+
+
+def _fmt_labels(names, values, extra=""):
+    parts = [f'{n}="{str(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, v in items:
+            out.append(f"{self.name}{_fmt_labels(self.labels, key)} {v}")
+        return out
+
+
+class Gauge:
+    def __init__(self, name: str, help: str, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def set(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self):
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, v in items:
+            out.append(f"{self.name}{_fmt_labels(self.labels, key)} {v}")
+        return out
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}   # key -> [bucket_counts, sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            st = self._values.get(key)
+            if st is None:
+                st = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if i < len(self.buckets):
+                st[0][i] += 1
+            st[1] += value
+            st[2] += 1
+
+    def render(self):
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        for key, (counts, total, n) in items:
+            acc = 0
+            for le, c in zip(self.buckets, counts):
+                acc += c
+                le_label = 'le="%s"' % le
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le_label)} {acc}")
+            inf_label = 'le="+Inf"'
+            out.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, inf_label)} {n}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {total}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {n}")
+        return out
+
+
+STAGE_SECONDS  = Histogram("librarian_stage_seconds", "Duration of an instrumented stage.", ["stage"])
+STAGE_ERRORS   = Counter("librarian_stage_errors_total", "Stages that raised.", ["stage"])
+HTTP_SECONDS   = Histogram("librarian_http_request_seconds", "HTTP request latency.", ["method", "route"])
+HTTP_REQUESTS  = Counter("librarian_http_requests_total", "HTTP requests served.", ["method", "route", "status"])
+
+
+@contextmanager
+def span(stage: str):
+    """Time a block; recorded in the stage histogram and the current request's Server-Timing."""
+    t0 = perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        dt = perf_counter() - t0
+        STAGE_SECONDS.observe(dt, stage=stage)
+        stages = _stages.get()
+        if stages is not None:
+            stages.append((stage, dt))
+
+
+def render() -> str:
+    lines = []
+    for m in _registry:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+def _server_timing(stages, total: float) -> str:
+    agg = {}
+    for stage, dt in stages:
+        agg[stage] = agg.get(stage, 0.0) + dt
+    parts = [f"{s};dur={dt * 1000:.1f}" for s, dt in agg.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: request latency/count metrics + optional Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stages = []
+        token = _stages.set(stages)   # shared list: sync endpoints in the threadpool append to it
+        t0 = perf_counter()
+        status = {"code": 500}
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(stages, perf_counter() - t0).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _stages.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "other"   # mounts (/ui) have no route
+            HTTP_SECONDS.observe(perf_counter() - t0, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status["code"])
@@ -2,17 +2,18 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import Optional, Literal
 from sqlmodel import SQLModel, Field, Session, create_engine, select
+from sqlalchemy import update
 from pathlib import Path
-import os
+import os, threading
 from typing import Optional
 from enum import Enum as PyEnum
 
 APP_DIR   = Path(__file__).resolve().parent
 DATA_DIR  = APP_DIR / "data"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
-DB_URL    = f"sqlite:///{(DATA_DIR / 'auth.db').as_posix()}"
+DB_URL    = os.getenv("AUTH_DB_URL", f"sqlite:///{(DATA_DIR / 'auth.db').as_posix()}")
 
-engine = create_engine(DB_URL, echo=False)
+_engine = None
+_engine_lock = threading.Lock()
 
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -65,9 +66,40 @@ class UserBadge(SQLModel, table=True):
     description: str
     awarded_at: datetime = Field(default_factory=datetime.utcnow)
 
+class UserDataVersion(SQLModel, table=True):
+    """Bumped on every shelf/badge/search write; the /me endpoints derive their ETag from it."""
+    user_id: int = Field(primary_key=True, foreign_key="user.id")
+    version: int = 0
+
+def get_data_version(sess: Session, user_id: int) -> int:
+    row = sess.get(UserDataVersion, user_id)
+    return row.version if row else 0
+
+def bump_data_version(sess: Session, user_id: int) -> None:
+    """Atomic +1 in the caller's transaction; committed together with the write it describes."""
+    res = sess.execute(
+        update(UserDataVersion)
+        .where(UserDataVersion.user_id == user_id)
+        .values(version=UserDataVersion.version + 1)
+    )
+    if not res.rowcount:
+        sess.add(UserDataVersion(user_id=user_id, version=1))
+
+def get_engine():
+    """Create the engine and tables on first use (normally from the startup warmup)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                DATA_DIR.mkdir(parents=True, exist_ok=True)
+                eng = create_engine(DB_URL, echo=False)
+                SQLModel.metadata.create_all(eng)
+                _engine = eng
+    return _engine
+
 def init_db():
-    SQLModel.metadata.create_all(engine)
+    get_engine()
 
 def get_session():
-    with Session(engine) as s:
+    with Session(get_engine()) as s:
         yield s
\ No newline at end of file
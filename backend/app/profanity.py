@@ -1,5 +1,21 @@
-from better_profanity import profanity
-profanity.load_censor_words()
+import threading
+
+_profanity = None
+_lock = threading.Lock()
+
+def _filter():
+    """Load the wordlist once, on first use (or from the startup warmup)."""
+    global _profanity
+    if _profanity is None:
+        with _lock:
+            if _profanity is None:
+                from better_profanity import profanity
+                profanity.load_censor_words()
+                _profanity = profanity
+    return _profanity
+
+def warm():
+    _filter()
 
 def is_clean(text: str) -> bool:
-    return not profanity.contains_profanity(text or "")
+    return not _filter().contains_profanity(text or "")
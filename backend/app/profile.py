@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel
 from sqlmodel import Session, select
 from typing import Optional, List
@@ -6,9 +6,12 @@ from datetime import datetime
 from sqlalchemy import func
 
 from .models import (
-    get_session, User, BookShelf, SearchEvent, UserBadge, ShelfStatus
+    get_session, User, BookShelf, SearchEvent, UserBadge, ShelfStatus,
+    get_data_version, bump_data_version
 )
 from .auth import get_current_user  # reuse your bearer/cookie auth
+from .taste import on_shelf_change
+from .http_cache import user_etag, etag_matches, cache_headers, not_modified
 
 
 router = APIRouter(prefix="/me", tags=["me"])
@@ -23,6 +26,7 @@ def _award(sess: Session, user_id: int, code: str, name: str, desc: str):
     if _has_badge(sess, user_id, code): 
         return
     sess.add(UserBadge(user_id=user_id, code=code, name=name, description=desc))
+    bump_data_version(sess, user_id)
     sess.commit()
 
 def recompute_badges(sess: Session, user_id: int):
@@ -44,6 +48,14 @@ def recompute_badges(sess: Session, user_id: int):
     if rcount and rcount[0] >= 5:
         _award(sess, user_id, "VORACIOUS", "Voracious reader", "Finished 5 books.")
 
+def _fresh(request: Request, response: Response, user: User, sess: Session):
+    """Tag `response` with the caller's data version; returns the ETag if the client copy is current."""
+    etag = user_etag(user.id, get_data_version(sess, user.id))
+    if etag_matches(request, etag):
+        return etag
+    response.headers.update(cache_headers(etag))
+    return None
+
 # ---------- schemas ----------
 class ShelfItemIn(BaseModel):
     title: str
@@ -55,7 +67,9 @@ class ShelfItemPatch(BaseModel):
 
 # ---------- routes ----------
 @router.get("")
-def me(user: User = Depends(get_current_user), sess: Session = Depends(get_session)):
+def me(request: Request, response: Response, user: User = Depends(get_current_user), sess: Session = Depends(get_session)):
+    etag = _fresh(request, response, user, sess)
+    if etag: return not_modified(etag)
     searches = sess.exec(select(func.count(SearchEvent.id)).where(SearchEvent.user_id==user.id)).one()[0]
     want = sess.exec(select(func.count(BookShelf.id)).where(BookShelf.user_id==user.id, BookShelf.status==ShelfStatus.WANT)).one()[0]
     read = sess.exec(select(func.count(BookShelf.id)).where(BookShelf.user_id==user.id, BookShelf.status==ShelfStatus.READ)).one()[0]
@@ -66,11 +80,15 @@ def me(user: User = Depends(get_current_user), sess: Session = Depends(get_sessi
     }
 
 @router.get("/badges")
-def my_badges(user: User = Depends(get_current_user), sess: Session = Depends(get_session)):
+def my_badges(request: Request, response: Response, user: User = Depends(get_current_user), sess: Session = Depends(get_session)):
+    etag = _fresh(request, response, user, sess)
+    if etag: return not_modified(etag)
     return sess.exec(select(UserBadge).where(UserBadge.user_id==user.id).order_by(UserBadge.awarded_at.desc())).all()
 
 @router.get("/shelf")
-def shelf(status: Optional[ShelfStatus] = None, user: User = Depends(get_current_user), sess: Session = Depends(get_session)):
+def shelf(request: Request, response: Response, status: Optional[ShelfStatus] = None, user: User = Depends(get_current_user), sess: Session = Depends(get_session)):
+    etag = _fresh(request, response, user, sess)
+    if etag: return not_modified(etag)
     q = select(BookShelf).where(BookShelf.user_id==user.id).order_by(BookShelf.added_at.desc())
     if status: q = q.where(BookShelf.status==status)
     return sess.exec(q).all()
@@ -78,7 +96,8 @@ def shelf(status: Optional[ShelfStatus] = None, user: User = Depends(get_current
 @router.post("/shelf")
 def shelf_add(item: ShelfItemIn, user: User = Depends(get_current_user), sess: Session = Depends(get_session)):
     row = BookShelf(user_id=user.id, title=item.title, author=item.author or "", status=item.status)
-    sess.add(row); sess.commit(); sess.refresh(row)
+    sess.add(row); bump_data_version(sess, user.id); sess.commit(); sess.refresh(row)
+    on_shelf_change(user.email, row.title, None, row.status)
     recompute_badges(sess, user.id)
     return row
 
@@ -86,8 +105,10 @@ def shelf_add(item: ShelfItemIn, user: User = Depends(get_current_user), sess: S
 def shelf_patch(item_id: int, patch: ShelfItemPatch, user: User = Depends(get_current_user), sess: Session = Depends(get_session)):
     row = sess.get(BookShelf, item_id)
     if not row or row.user_id != user.id: raise HTTPException(404, "Not found")
+    old = row.status
     row.status = patch.status
-    sess.add(row); sess.commit()
+    sess.add(row); bump_data_version(sess, user.id); sess.commit()
+    on_shelf_change(user.email, row.title, old, row.status)
     recompute_badges(sess, user.id)
     return {"ok": True}
 
@@ -95,13 +116,15 @@ def shelf_patch(item_id: int, patch: ShelfItemPatch, user: User = Depends(get_cu
 def shelf_delete(item_id: int, user: User = Depends(get_current_user), sess: Session = Depends(get_session)):
     row = sess.get(BookShelf, item_id)
     if not row or row.user_id != user.id: raise HTTPException(404, "Not found")
-    sess.delete(row); sess.commit()
+    title, old = row.title, row.status
+    sess.delete(row); bump_data_version(sess, user.id); sess.commit()
+    on_shelf_change(user.email, title, old, None)
     return {"ok": True}
 
 @router.post("/track/search")
 def track_search(body: dict, user: User = Depends(get_current_user), sess: Session = Depends(get_session)):
     q = (body.get("query") or "").strip()
     if not q: return {"skipped": True}
-    sess.add(SearchEvent(user_id=user.id, query=q)); sess.commit()
+    sess.add(SearchEvent(user_id=user.id, query=q)); bump_data_version(sess, user.id); sess.commit()
     recompute_badges(sess, user.id)
     return {"ok": True}
\ No newline at end of file
@@ -1,16 +1,22 @@
-import os, chromadb
+# chromadb, openai and tiktoken are imported lazily (see warm()) to keep worker cold-start fast
+import os, json
 from pathlib import Path
-from chromadb.config import Settings
 from dotenv import load_dotenv
-from openai import OpenAI
+from .metrics import span
+from . import catalog, taste
 
 load_dotenv()
 
 APP_DIR    = Path(__file__).resolve().parent
-CHROMA_DIR = os.getenv("CHROMA_DIR", str(APP_DIR / "data" / "chroma"))
 CHAT_MODEL  = os.getenv("CHAT_MODEL", "gpt-4o-nano")
 EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-3-small")
 
+# "tool": model calls get_summary_by_title (second store lookup)
+# "structured": model returns the candidate index as JSON, resolved from the in-hand candidates
+RECOMMEND_MODE       = os.getenv("RECOMMEND_MODE", "tool").lower()
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+RECOMMEND_MAX_TOKENS = int(os.getenv("RECOMMEND_MAX_TOKENS", "20"))
+
 SYSTEM = (
     "You are a helpful librarian. From the retrieved context (a list of book "
     "titles with authors, difficulties, and short summaries), choose exactly ONE best title "
@@ -19,26 +25,68 @@ SYSTEM = (
     "(Beginner / Intermediate / Advanced). Always answer in English."
 )
 
-client_oai = OpenAI()
+# Static text with no per-request data. At ~80 tokens it is far below the 1024-token minimum
+# for provider-side prompt caching, so it saves nothing today; padding it to qualify would bill
+# more input than the per-request candidates it could save.
+STRUCTURED_SYSTEM = (
+    "You are a helpful librarian. The user message lists numbered candidate books "
+    "(index, title, author, difficulty, short summary) followed by the reader's request. "
+    "Choose exactly ONE candidate that best fits the request. If the reader mentions an "
+    "easier/harder read, consider the difficulty labels (Beginner / Intermediate / Advanced). "
+    "Reply with the chosen candidate's index only."
+)
+
+RECOMMENDATION_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "recommendation",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"index": {"type": "integer"}},
+            "required": ["index"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+_oai = None
+_enc = None
+
+def openai_client():
+    global _oai
+    if _oai is None:
+        from openai import OpenAI
+        _oai = OpenAI()
+    return _oai
 
 def _embed_query(text: str):
-    return client_oai.embeddings.create(model=EMBED_MODEL, input=[text]).data[0].embedding
+    with span("rag.embed"):
+        return openai_client().embeddings.create(model=EMBED_MODEL, input=[text]).data[0].embedding
 
 def _col():
-    client = chromadb.PersistentClient(path=CHROMA_DIR, settings=Settings())
+    return catalog.active_collection()
+
+def _query(**kwargs):
     try:
-        return client.get_collection("books")
-    except Exception as e:
-        raise RuntimeError(f"No 'books' collection in {CHROMA_DIR}. Did you run ingestion?") from e
+        return _col().query(**kwargs)
+    except Exception:
+        # the cached version may have been garbage-collected by a re-index; reopen once
+        catalog.invalidate()
+        return _col().query(**kwargs)
 
-def retrieve(query: str, k=5):
+def retrieve(query: str, k=5, profile=None):
+    """Top-k hits + best distance. With a taste profile: over-fetch, drop shelved titles, re-rank."""
     emb = _embed_query(query)
-    col = _col()
-    res = col.query(
-        query_embeddings=[emb],
-        n_results=k,
-        include=["metadatas","documents","distances"]  # distances for confidence gating
-    )
+    include = ["metadatas","documents","distances"]  # distances for confidence gating
+    if profile is not None:
+        include.append("embeddings")
+    with span("rag.query"):
+        res = _query(
+            query_embeddings=[emb],
+            n_results=k * taste.TASTE_OVERFETCH if profile is not None else k,
+            include=include
+        )
     metas = res["metadatas"][0]
     docs  = res["documents"][0]
     dists = res["distances"][0] if "distances" in res else [1.0]
@@ -51,7 +99,11 @@ def retrieve(query: str, k=5):
             "short_summary": meta.get("short_summary",""),
             "doc": doc,
         })
-    best_dist = dists[0] if dists else 1.0
+    best_dist = dists[0] if dists else 1.0   # gate on raw query relevance, before personalisation
+    if profile is not None:
+        embs = res.get("embeddings")
+        with span("rag.rerank"):
+            hits, _ = taste.rerank(profile, hits, dists, embs[0] if embs is not None else None, k)
     return hits, best_dist
 
 def chat_recommendation(user_query: str, retrieved):
@@ -72,10 +124,63 @@ def chat_recommendation(user_query: str, retrieved):
       {"role":"user","content": user_query},
       {"role":"system","content": f"Context (top matches):\n{context}\n\nPick one title and call the tool with that exact title."}
     ]
-    return client_oai.chat.completions.create(
-        model=CHAT_MODEL, messages=msg, tools=tools, tool_choice="auto",
-        temperature=0.3, max_tokens=500
-    )
+    with span("rag.chat"):
+        return openai_client().chat.completions.create(
+            model=CHAT_MODEL, messages=msg, tools=tools, tool_choice="auto",
+            temperature=0.3, max_tokens=500
+        )
+
+def _encoding():
+    global _enc
+    if _enc is None:
+        import tiktoken
+        try:
+            _enc = tiktoken.encoding_for_model(CHAT_MODEL)
+        except KeyError:   # model unknown to this tiktoken version
+            _enc = tiktoken.get_encoding("o200k_base")
+    return _enc
+
+def build_context(retrieved, budget: int = CONTEXT_TOKEN_BUDGET):
+    """Numbered candidate lines, cut to `budget` tokens. Returns (context, n_candidates_kept)."""
+    enc = _encoding()
+    lines, used = [], 0
+    for i, x in enumerate(retrieved):
+        line = f"[{i}] {x['title']} — {x['author']} [{x['difficulty']}]: {x['short_summary']}"
+        toks = enc.encode(line)
+        if used + len(toks) > budget:
+            if not lines:   # always keep the top candidate, truncated if needed
+                lines.append(enc.decode(toks[:budget]))
+            break
+        lines.append(line)
+        used += len(toks) + 1   # + newline
+    return "\n".join(lines), len(lines)
+
+def pick_candidate(user_query: str, retrieved):
+    """Single structured call; returns an index into `retrieved` (0 on any bad reply)."""
+    context, kept = build_context(retrieved)
+    msg = [
+        {"role": "system", "content": STRUCTURED_SYSTEM},
+        {"role": "user", "content": f"Candidates:\n{context}\n\nRequest: {user_query}"},
+    ]
+    with span("rag.chat"):
+        resp = openai_client().chat.completions.create(
+            model=CHAT_MODEL, messages=msg, response_format=RECOMMENDATION_FORMAT,
+            temperature=0, max_tokens=RECOMMEND_MAX_TOKENS
+        )
+    try:
+        idx = int(json.loads(resp.choices[0].message.content or "{}")["index"])
+    except (ValueError, KeyError, TypeError):
+        return 0
+    return idx if 0 <= idx < kept else 0
+
+def warm():
+    """Open the catalog store; called from the startup warmup."""
+    _col()
+
+def warm_tokenizer():
+    """Load the tokenizer, which only the structured mode uses (tiktoken fetches it on a cold cache)."""
+    if RECOMMEND_MODE == "structured":
+        _encoding()
 
 
 def looks_like_book_query(q: str) -> bool:
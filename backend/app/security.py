@@ -2,6 +2,7 @@ import os
 from datetime import datetime, timedelta
 from jose import jwt
 from passlib.context import CryptContext
+from .metrics import span
 
 PWD_CTX = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -11,10 +12,12 @@ ACCESS_MIN = int(os.getenv("JWT_ACCESS_MIN", "60"))
 REFRESH_D  = int(os.getenv("JWT_REFRESH_DAYS", "7"))
 
 def hash_password(pw: str) -> str:
-    return PWD_CTX.hash(pw)
+    with span("security.hash"):
+        return PWD_CTX.hash(pw)
 
 def verify_password(pw: str, pw_hash: str) -> bool:
-    return PWD_CTX.verify(pw, pw_hash)
+    with span("security.verify"):
+        return PWD_CTX.verify(pw, pw_hash)
 
 def create_access_token(sub: str) -> str:
     exp = datetime.utcnow() + timedelta(minutes=ACCESS_MIN)
@@ -0,0 +1,140 @@
+# backend/app/taste.py
+"""Per-user taste vectors for personalised re-ranking in /ask.
+
+A profile is the weighted sum of the stored catalog vectors of the books on
+the user's shelf (READ > READING > WANT) plus the multiset of shelved titles.
+It is built from the DB on a cache miss and kept current by the shelf routes
+of this process; TASTE_TTL bounds how long writes made through other workers
+can go unseen. /ask never calls the embedding API for personalisation.
+"""
+import os, threading, time
+from collections import Counter, OrderedDict
+from sqlmodel import Session, select
+
+from . import catalog
+from .models import get_engine, BookShelf, ShelfStatus, User
+
+TASTE_CACHE_SIZE = int(os.getenv("TASTE_CACHE_SIZE", "5000"))
+TASTE_ALPHA      = float(os.getenv("TASTE_ALPHA", "0.3"))   # weight of profile similarity in the score
+TASTE_OVERFETCH  = int(os.getenv("TASTE_OVERFETCH", "3"))   # fetch k * this many, then re-rank
+TASTE_TTL        = float(os.getenv("TASTE_TTL", "60"))     # seconds; rebuild so other workers' writes show up
+
+WEIGHTS = {ShelfStatus.READ: 1.0, ShelfStatus.READING: 0.75, ShelfStatus.WANT: 0.5}
+
+_cache = OrderedDict()   # email -> Profile, LRU
+_lock = threading.Lock()
+_writes = 0              # bumped on every shelf write; a build that overlaps one is not cached
+
+
+class Profile:
+    def __init__(self, collection: str):
+        self.collection = collection   # vectors are only comparable within one index version
+        self.vec = None                # weighted sum, numpy array
+        self.weight = 0.0
+        self.titles = Counter()        # lower-cased shelved titles (exclusions)
+        self.built_at = time.monotonic()
+
+    def add(self, title: str, status, vec, sign: float = 1.0):
+        key = title.strip().lower()
+        self.titles[key] += 1 if sign > 0 else -1
+        if self.titles[key] <= 0:
+            del self.titles[key]
+        if vec is None:
+            return
+        w = sign * WEIGHTS.get(status, 0.5)
+        self.vec = vec * w if self.vec is None else self.vec + vec * w
+        self.weight += w
+
+    def unit(self):
+        """Normalised profile vector, or None when there is nothing to personalise with."""
+        import numpy as np
+        if self.vec is None or self.weight <= 1e-9:
+            return None
+        n = np.linalg.norm(self.vec)
+        return self.vec / n if n > 1e-9 else None
+
+
+def _vectors(titles):
+    """title -> stored catalog vector, for the titles present in the active collection."""
+    import numpy as np
+    titles = sorted({t for t in titles if t})
+    if not titles:
+        return {}
+    where = {"title": titles[0]} if len(titles) == 1 else {"title": {"$in": titles}}
+    r = catalog.active_collection().get(where=where, include=["embeddings", "metadatas"])
+    out = {}
+    for meta, emb in zip(r["metadatas"], r["embeddings"]):
+        out[meta.get("title", "")] = np.asarray(emb, dtype=np.float32)
+    return out
+
+
+def _build(email: str) -> Profile:
+    with Session(get_engine()) as s:
+        rows = s.exec(select(BookShelf).join(User, User.id == BookShelf.user_id).where(User.email == email)).all()
+    col = catalog.active_collection()
+    prof = Profile(col.name)
+    vecs = _vectors(r.title for r in rows)
+    for r in rows:
+        prof.add(r.title, r.status, vecs.get(r.title))
+    return prof
+
+
+def profile_for(email: str):
+    """Cached profile for a user. None for anonymous users and users with an empty shelf."""
+    if not email:
+        return None
+    active = catalog.active_collection().name
+    with _lock:
+        prof = _cache.get(email)
+        if (prof is not None and prof.collection == active
+                and time.monotonic() - prof.built_at < TASTE_TTL):
+            _cache.move_to_end(email)
+            return prof if prof.titles else None
+    with _lock:
+        seen = _writes
+    prof = _build(email)
+    with _lock:
+        if _writes == seen:   # else a shelf write raced the build; use it once, rebuild next time
+            _cache[email] = prof
+            _cache.move_to_end(email)
+            while len(_cache) > TASTE_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return prof if prof.titles else None   # nothing to exclude or re-rank by: skip the over-fetch
+
+
+def on_shelf_change(email: str, title: str, old_status=None, new_status=None):
+    """Apply one shelf write to a cached profile. Uncached users are rebuilt lazily instead."""
+    global _writes
+    with _lock:
+        _writes += 1
+        prof = _cache.get(email)
+    if prof is None:
+        return
+    try:
+        vec = _vectors([title]).get(title)
+    except Exception:
+        with _lock:
+            _cache.pop(email, None)   # can't update incrementally; rebuild on next /ask
+        return
+    with _lock:
+        if old_status is not None:
+            prof.add(title, old_status, vec, sign=-1.0)
+        if new_status is not None:
+            prof.add(title, new_status, vec)
+
+
+def rerank(prof: Profile, hits, dists, embeddings, k: int):
+    """Drop shelved titles, then score = (1-a)*query_sim + a*profile_sim in one vectorised pass."""
+    import numpy as np
+    keep = [i for i, h in enumerate(hits) if h["title"].strip().lower() not in prof.titles]
+    if not keep:
+        return [], []
+    q_sim = 1.0 - np.asarray([dists[i] for i in keep], dtype=np.float32)   # cosine distance -> similarity
+    score = q_sim
+    unit = prof.unit()
+    if unit is not None and embeddings is not None:
+        E = np.asarray([embeddings[i] for i in keep], dtype=np.float32)
+        E /= np.maximum(np.linalg.norm(E, axis=1, keepdims=True), 1e-9)
+        score = (1.0 - TASTE_ALPHA) * q_sim + TASTE_ALPHA * (E @ unit)
+    order = np.argsort(-score, kind="stable")[:k]
+    return [hits[keep[i]] for i in order], [dists[keep[i]] for i in order]
@@ -1,19 +1,16 @@
-import os, chromadb
-from pathlib import Path
-from dotenv import load_dotenv
-from chromadb.config import Settings
-
-load_dotenv()
-APP_DIR    = Path(__file__).resolve().parent
-CHROMA_DIR = os.getenv("CHROMA_DIR", str(APP_DIR / "data" / "chroma"))
+from .metrics import span
+from .catalog import active_collection
 
 def get_summary_by_title(title: str):
+    with span("tools.lookup"):
+        return _get_summary_by_title(title)
+
+def _get_summary_by_title(title: str):
     if not title:
         return None
     t = title.strip().strip('"\'')
 
-    client = chromadb.PersistentClient(path=CHROMA_DIR, settings=Settings())
-    col = client.get_collection("books")
+    col = active_collection()
 
     r = col.get(where={"title": t})
     if r["ids"]:
@@ -1,15 +1,17 @@
 # backend/app/tts.py
-from gtts import gTTS
 from io import BytesIO
+from .metrics import span
 
 def text_to_speech_mp3(text: str, lang: str = "ro") -> bytes:
     """
     Generate MP3 bytes in memory (no temp files -> Windows-safe).
     Requires internet access for gTTS.
     """
+    from gtts import gTTS   # lazy: gtts pulls in requests/bs4, not needed until first /tts
     t = (text or "I have nothing to read.").strip()
-    tts = gTTS(t, lang=lang)
     buf = BytesIO()
-    tts.write_to_fp(buf)
+    with span("tts.synthesize"):
+        tts = gTTS(t, lang=lang)
+        tts.write_to_fp(buf)
     buf.seek(0)
     return buf.read()
@@ -0,0 +1,96 @@
+# backend/app/warmup.py
+"""Startup warmup: heavy imports and caches, loaded in parallel off the request path.
+
+The app starts accepting connections immediately; /ready reports 503 until
+every task below has run and the critical ones (catalog store, DB) have
+succeeded, so a load balancer can hold traffic back while /health keeps
+answering for liveness. Critical tasks are retried with backoff; the others
+are best-effort and their lazy first use retries them on the request path.
+"""
+import os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+WARMUP_WORKERS     = int(os.getenv("WARMUP_WORKERS", "4"))
+WARMUP_RETRY_S     = float(os.getenv("WARMUP_RETRY_S", "1"))       # first retry delay for critical tasks, doubled
+WARMUP_RETRY_MAX_S = float(os.getenv("WARMUP_RETRY_MAX_S", "30"))  # backoff cap
+
+_state = {"started_at": None, "done": False, "seconds": None, "critical": [],
+          "tasks": {}, "attempts": {}, "errors": {}}
+_lock = threading.Lock()
+
+
+def _tasks():
+    from . import rag, intent, profanity, models
+    return {   # name -> (fn, critical)
+        "catalog": (rag.warm, True),               # chromadb import + active collection open
+        "db": (models.init_db, True),              # engine + tables
+        "openai": (rag.openai_client, False),      # openai import + client (needs OPENAI_API_KEY)
+        "tokenizer": (rag.warm_tokenizer, False),  # structured mode only; may download the encoding
+        "intent": (intent.warm, False),            # train the local classifier
+        "profanity": (profanity.warm, False),
+    }
+
+
+def _timed(name, fn, critical, retry):
+    delay = WARMUP_RETRY_S
+    while True:
+        t0 = time.perf_counter()
+        with _lock:
+            _state["attempts"][name] = _state["attempts"].get(name, 0) + 1
+        try:
+            fn()
+        except Exception as e:   # a failed task is reported, the app keeps serving
+            with _lock:
+                _state["errors"][name] = f"{type(e).__name__}: {e}"
+                _state["tasks"][name] = round(time.perf_counter() - t0, 4)
+            if not (critical and retry):
+                print(f"[WARMUP] {name} failed: {e}")
+                return
+            print(f"[WARMUP] {name} failed, retrying in {delay:g}s: {e}")
+            time.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_S)
+            continue
+        with _lock:
+            _state["errors"].pop(name, None)
+            _state["tasks"][name] = round(time.perf_counter() - t0, 4)
+        return
+
+
+def run(retry: bool = True):
+    """Run all tasks in parallel and block until they finish. Returns the status dict.
+
+    With retry, critical tasks are retried until they succeed (so this only returns then).
+    """
+    t0 = time.perf_counter()
+    tasks = _tasks()
+    with _lock:
+        _state["started_at"] = time.time()
+        _state["critical"] = [n for n, (_, critical) in tasks.items() if critical]
+    with ThreadPoolExecutor(max_workers=WARMUP_WORKERS, thread_name_prefix="warmup") as ex:
+        for name, (fn, critical) in tasks.items():
+            ex.submit(_timed, name, fn, critical, retry)
+    with _lock:
+        _state["seconds"] = round(time.perf_counter() - t0, 4)
+        _state["done"] = True
+    return status()
+
+
+def start():
+    """Kick off run() in a daemon thread (called from the app lifespan)."""
+    threading.Thread(target=run, name="warmup", daemon=True).start()
+
+
+def status():
+    with _lock:
+        return {**_state, "critical": list(_state["critical"]), "tasks": dict(_state["tasks"]),
+                "attempts": dict(_state["attempts"]), "errors": dict(_state["errors"]), "ready": _ready()}
+
+
+def _ready() -> bool:
+    return _state["done"] and not any(n in _state["errors"] for n in _state["critical"])
+
+
+def is_ready() -> bool:
+    """All tasks have run and every critical one succeeded; best-effort failures don't count."""
+    with _lock:
+        return _ready()
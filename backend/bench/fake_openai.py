@@ -0,0 +1,152 @@
+# backend/bench/fake_openai.py
+"""Stand-in for the OpenAI HTTP API, good enough for the endpoints the app uses.
+
+- POST /v1/embeddings        deterministic hashed bag-of-words vectors
+- POST /v1/chat/completions  sleeps CHAT_LATENCY, then replies per TOOL_MODE:
+                             first          call get_summary_by_title with the first context title
+                             random         ... with a random context title
+                             none           plain text, no tool call (the /ask fallback path)
+                             unknown-title  ... with a title not in the catalog (lookup-miss path)
+                             mix            one of the above per call
+                             With a json_schema response_format it returns {"index": n} instead
+                             (n = 0 for "first", random otherwise, out of range for "unknown-title").
+
+Run standalone:  python -m bench.fake_openai --port 8900 --chat-latency 0.3 --tool-mode mix
+"""
+import argparse, json, math, random, re, threading, time, zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_TITLE = re.compile(r"^\s*(?:\[\d+\]\s*|-\s*)(.+?) — ", re.M)
+TOOL_MODES = ("first", "random", "none", "unknown-title", "mix")
+
+
+def fake_embedding(text: str, dim: int):
+    """Same text -> same vector; texts sharing words end up close in cosine space."""
+    vec = [0.0] * dim
+    for w in _TOKEN.findall((text or "").lower()):
+        h = zlib.crc32(w.encode("utf-8"))
+        vec[h % dim] += 1.0 if (h >> 16) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+class FakeOpenAI:
+    def __init__(self, dim=256, chat_latency=0.3, embed_latency=0.02, tool_mode="first", seed=11):
+        if tool_mode not in TOOL_MODES:
+            raise ValueError(f"tool_mode must be one of {', '.join(TOOL_MODES)}")
+        self.dim, self.chat_latency, self.embed_latency = dim, chat_latency, embed_latency
+        self.tool_mode = tool_mode
+        self.calls = {"embeddings": 0, "chat": 0}
+        self.replies = {m: 0 for m in TOOL_MODES if m != "mix"}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _count(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+
+    def embeddings(self, body):
+        self._count("embeddings")
+        inputs = body.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        time.sleep(self.embed_latency)
+        n_tok = sum(len(_TOKEN.findall(str(t))) for t in inputs)
+        return {
+            "object": "list",
+            "data": [{"object": "embedding", "index": i, "embedding": fake_embedding(str(t), self.dim)}
+                     for i, t in enumerate(inputs)],
+            "model": body.get("model", "fake-embed"),
+            "usage": {"prompt_tokens": n_tok, "total_tokens": n_tok},
+        }
+
+    def chat(self, body):
+        self._count("chat")
+        time.sleep(self.chat_latency)
+        text = "\n".join(str(m.get("content") or "") for m in body.get("messages", []))
+        titles = [t.strip() for t in _TITLE.findall(text)]
+        with self._lock:
+            mode = self._rng.choice(TOOL_MODES[:-1]) if self.tool_mode == "mix" else self.tool_mode
+            pick = self._rng.randrange(len(titles)) if titles else 0
+            self.replies[mode] += 1
+        if mode == "first":
+            pick = 0
+        title = titles[pick] if titles else ""
+        if mode == "unknown-title":
+            title = "A Book That Is Not In The Catalog"
+
+        message = {"role": "assistant", "content": None}
+        finish = "stop"
+        if (body.get("response_format") or {}).get("type") == "json_schema":
+            index = len(titles) + 5 if mode == "unknown-title" else pick
+            message["content"] = json.dumps({"index": index})
+        elif body.get("tools") and title and mode != "none":
+            message["tool_calls"] = [{
+                "id": "call_bench", "type": "function",
+                "function": {"name": "get_summary_by_title", "arguments": json.dumps({"title": title})},
+            }]
+            finish = "tool_calls"
+        else:
+            message["content"] = f"I recommend {title or 'a good book'}."
+        return {
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "fake-chat"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+            "usage": {"prompt_tokens": len(_TOKEN.findall(text)), "completion_tokens": 12,
+                      "total_tokens": len(_TOKEN.findall(text)) + 12},
+        }
+
+
+def _handler(fake: FakeOpenAI):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):   # keep bench output clean
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if self.path.endswith("/embeddings"):
+                payload = fake.embeddings(body)
+            elif self.path.endswith("/chat/completions"):
+                payload = fake.chat(body)
+            else:
+                self.send_error(404)
+                return
+            raw = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+    return Handler
+
+
+def start(port=0, **kwargs):
+    """Start in a daemon thread; returns (server, fake). server.server_address has the bound port."""
+    fake = FakeOpenAI(**kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, fake
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Fake OpenAI-compatible server")
+    ap.add_argument("--port", type=int, default=8900)
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--chat-latency", type=float, default=0.3)
+    ap.add_argument("--embed-latency", type=float, default=0.02)
+    ap.add_argument("--tool-mode", choices=TOOL_MODES, default="first")
+    a = ap.parse_args()
+    srv, _ = start(a.port, dim=a.dim, chat_latency=a.chat_latency, embed_latency=a.embed_latency,
+                   tool_mode=a.tool_mode)
+    print(f"[BENCH] fake OpenAI on http://127.0.0.1:{srv.server_address[1]}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,322 @@
+# backend/bench/run.py
+"""Offline load test: fake OpenAI + synthetic catalog + real app under uvicorn.
+
+    cd backend
+    python -m bench.run --books 500 --concurrency 8 --requests 200
+    python -m bench.run --scenarios ask,shelf --compare bench/results/<previous>.json
+
+Reports p50/p95/p99 latency, throughput and error counts per scenario and
+writes everything to bench/results/<timestamp>.json.
+"""
+import argparse, hashlib, http.client, json, math, os, random, socket, subprocess, sys, tempfile, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from . import fake_openai
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SCENARIOS   = ("ask", "login", "shelf", "tts")
+PASSWORD    = "bench-password"
+DEAD_PROXY  = "http://127.0.0.1:9"   # nothing listens here: any non-local HTTP(S) fails fast
+O200K_URL   = "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken"
+
+GENRES = ["fantasy", "science fiction", "mystery", "romance", "history", "thriller", "dystopian", "adventure"]
+NOUNS  = ["harbor", "empire", "garden", "machine", "river", "crown", "signal", "orchard", "tower", "voyage"]
+ADJS   = ["silent", "broken", "hidden", "burning", "endless", "last", "golden", "frozen", "distant", "quiet"]
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+QUERIES = [
+    "Recommend me a {g} novel about a {n}",
+    "I want to read a {g} book with a {a} {n}",
+    "A beginner-friendly {g} story",
+    "Suggest an advanced {g} novel",
+]
+
+
+# ---------- setup ----------
+def synthetic_books(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    books = []
+    for i in range(n):
+        g, a, no = rng.choice(GENRES), rng.choice(ADJS), rng.choice(NOUNS)
+        title = f"The {a.title()} {no.title()} {i}"
+        books.append({
+            "title": title,
+            "author": f"Author {i % 97}",
+            "difficulty": rng.choice(LEVELS),
+            "short_summary": f"A {g} tale about a {a} {no}.",
+            "full_summary": f"A {g} novel in which a {a} {no} changes everything for its reluctant heroes.",
+        })
+    return books
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_env(tmp: Path, openai_port: int, tts_latency: float, allow_network: bool = False):
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openai_port}/v1",
+        "OPENAI_API_KEY": "bench",
+        "CHROMA_DIR": str(tmp / "chroma"),
+        "BOOKS_JSONL": str(tmp / "books.jsonl"),
+        "AUTH_DB_URL": f"sqlite:///{(tmp / 'auth.db').as_posix()}",
+        "TTS_LATENCY": str(tts_latency),
+        "PYTHONPATH": str(BACKEND_DIR),
+    })
+    # all bench traffic comes from one IP; keep rate limits out of the way unless set explicitly
+    for key in ("RATE_IP_PER_MIN", "RATE_IP_BURST", "RATE_USER_PER_MIN", "RATE_USER_BURST"):
+        env.setdefault(key, "1000000")
+    if not allow_network:
+        # the bench must run offline: route everything but 127.0.0.1 to a closed port so a
+        # stray download (tokenizer, telemetry, ...) fails the warmup instead of passing silently
+        env.update({"HTTP_PROXY": DEAD_PROXY, "HTTPS_PROXY": DEAD_PROXY, "ALL_PROXY": DEAD_PROXY,
+                    "NO_PROXY": "127.0.0.1,localhost", "ANONYMIZED_TELEMETRY": "False"})
+        for key in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY"):
+            env[key.lower()] = env[key]
+    return env
+
+
+def tiktoken_cached(env) -> bool:
+    """Whether tiktoken can load o200k_base (used by RECOMMEND_MODE=structured) without a download."""
+    d = env.get("TIKTOKEN_CACHE_DIR") or env.get("DATA_GYM_CACHE_DIR") or \
+        os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    return (Path(d) / hashlib.sha1(O200K_URL.encode()).hexdigest()).exists()
+
+
+def ingest(books, env) -> float:
+    with open(env["BOOKS_JSONL"], "w", encoding="utf-8") as f:
+        for b in books:
+            f.write(json.dumps(b) + "\n")
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "app.ingestion"], cwd=BACKEND_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+
+def seed_users(n: int, env):
+    """Create verified users directly in the bench DB (skips the email code round-trip)."""
+    code = (
+        "import sys\n"
+        "from sqlmodel import Session\n"
+        "from app.models import init_db, get_engine, User\n"
+        "from app.security import hash_password\n"
+        "init_db()\n"
+        "h = hash_password(sys.argv[2])\n"
+        "with Session(get_engine()) as s:\n"
+        "    for i in range(int(sys.argv[1])):\n"
+        "        s.add(User(email=f'bench{i}@example.com', password_hash=h, is_verified=True))\n"
+        "    s.commit()\n"
+    )
+    subprocess.run([sys.executable, "-c", code, str(n), PASSWORD], cwd=BACKEND_DIR, env=env, check=True)
+    return [f"bench{i}@example.com" for i in range(n)]
+
+
+def start_app(port: int, workers: int, env):
+    proc = subprocess.Popen([sys.executable, "-m", "bench.serve", "--port", str(port), "--workers", str(workers)],
+                            cwd=BACKEND_DIR, env=env)
+    deadline, last = time.time() + 60, {}
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"[BENCH] app exited with code {proc.returncode}")
+        try:
+            status, data = request(http.client.HTTPConnection("127.0.0.1", port, timeout=2), "GET", "/ready")
+            last = json.loads(data)
+            if status == 200:
+                break
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.2)
+    else:
+        proc.terminate()
+        raise SystemExit(f"[BENCH] app did not become ready within 60s: {last.get('errors') or last}")
+    # best-effort tasks don't block /ready, but in the bench every one of them must work offline
+    if last.get("errors"):
+        proc.terminate()
+        raise SystemExit(f"[BENCH] warmup failed: {last['errors']}")
+    return proc
+
+
+# ---------- load ----------
+def request(conn, method, path, body=None, token=None):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    raw = json.dumps(body).encode("utf-8") if body is not None else None
+    conn.request(method, path, body=raw, headers=headers)
+    resp = conn.getresponse()
+    data = resp.read()
+    return resp.status, data
+
+
+def login(port, email):
+    status, data = request(http.client.HTTPConnection("127.0.0.1", port), "POST", "/auth/login",
+                           {"email": email, "password": PASSWORD})
+    if status != 200:
+        raise SystemExit(f"[BENCH] login failed for {email}: {status} {data[:200]!r}")
+    return json.loads(data)["access_token"]
+
+
+def make_call(scenario: str, users, tokens, rng: random.Random):
+    if scenario == "ask":
+        q = rng.choice(QUERIES).format(g=rng.choice(GENRES), a=rng.choice(ADJS), n=rng.choice(NOUNS))
+        return "POST", "/ask", {"query": q}, None
+    if scenario == "login":
+        return "POST", "/auth/login", {"email": rng.choice(users), "password": PASSWORD}, None
+    if scenario == "shelf":
+        return "GET", "/me/shelf", None, rng.choice(tokens)
+    if scenario == "tts":
+        return "POST", "/tts", {"text": "The quiet harbor waits for the last voyage.", "lang": "en"}, None
+    raise ValueError(scenario)
+
+
+def percentile(sorted_vals, p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(p / 100.0 * len(sorted_vals)) - 1))   # nearest rank
+    return sorted_vals[k]
+
+
+def run_scenario(scenario, port, n_requests, concurrency, users, tokens):
+    latencies, errors = [], {}
+    lock = threading.Lock()
+    counter = iter(range(n_requests))
+    local = threading.local()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            conn = getattr(local, "conn", None) or http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+            local.conn = conn
+            method, path, body, token = make_call(scenario, users, tokens, rng)
+            t0 = time.perf_counter()
+            try:
+                status, _ = request(conn, method, path, body, token)
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                conn.close()
+                local.conn = None
+            dt = time.perf_counter() - t0
+            with lock:
+                latencies.append(dt)
+                if status != 200:
+                    errors[str(status)] = errors.get(str(status), 0) + 1
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        for i in range(concurrency):
+            ex.submit(worker, i)
+    wall = time.perf_counter() - t0
+
+    lat = sorted(latencies)
+    return {
+        "requests": len(lat),
+        "errors": errors,
+        "wall_s": round(wall, 4),
+        "throughput_rps": round(len(lat) / wall, 2) if wall else 0.0,
+        "mean_ms": round(1000 * sum(lat) / len(lat), 2) if lat else 0.0,
+        "p50_ms": round(1000 * percentile(lat, 50), 2),
+        "p95_ms": round(1000 * percentile(lat, 95), 2),
+        "p99_ms": round(1000 * percentile(lat, 99), 2),
+        "max_ms": round(1000 * lat[-1], 2) if lat else 0.0,
+    }
+
+
+# ---------- report ----------
+def print_table(results, baseline=None):
+    print(f"\n{'scenario':<8} {'reqs':>6} {'err':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, r in results.items():
+        errs = sum(r["errors"].values())
+        print(f"{name:<8} {r['requests']:>6} {errs:>5} {r['throughput_rps']:>8} "
+              f"{r['p50_ms']:>8}ms {r['p95_ms']:>8}ms {r['p99_ms']:>8}ms")
+        if baseline and name in baseline:
+            b = baseline[name]
+            def delta(key):
+                return f"{(r[key] - b[key]) / b[key] * 100:+.1f}%" if b.get(key) else "n/a"
+            print(f"{'  vs base':<8} {'':>6} {'':>5} {delta('throughput_rps'):>8} "
+                  f"{delta('p50_ms'):>9} {delta('p95_ms'):>9} {delta('p99_ms'):>9}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline benchmark for the Smart Librarian API")
+    ap.add_argument("--books", type=int, default=200, help="synthetic catalog size")
+    ap.add_argument("--users", type=int, default=20)
+    ap.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--chat-latency", type=float, default=0.3, help="fake chat completion latency (s)")
+    ap.add_argument("--embed-latency", type=float, default=0.02, help="fake embedding latency (s)")
+    ap.add_argument("--tts-latency", type=float, default=0.2, help="stand-in TTS latency (s)")
+    ap.add_argument("--dim", type=int, default=256, help="fake embedding dimension")
+    ap.add_argument("--recommend-mode", choices=["tool", "structured"], default="tool")
+    ap.add_argument("--tool-mode", choices=fake_openai.TOOL_MODES, default="first",
+                    help="fake chat reply: first/random title, none (no tool call), unknown-title, or mix")
+    ap.add_argument("--allow-network", action="store_true",
+                    help="let the app reach the network (default: everything but 127.0.0.1 is blocked)")
+    ap.add_argument("--out", default=None, help="results file (default bench/results/<timestamp>.json)")
+    ap.add_argument("--compare", default=None, help="previous results file to diff against")
+    a = ap.parse_args(argv)
+
+    scenarios = [s.strip() for s in a.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"[BENCH] unknown scenarios: {', '.join(sorted(unknown))}")
+    if a.recommend_mode == "structured" and not a.allow_network and not tiktoken_cached(os.environ):
+        raise SystemExit("[BENCH] --recommend-mode structured needs the o200k_base tiktoken encoding offline: "
+                         "set TIKTOKEN_CACHE_DIR to a directory holding it, or pass --allow-network to download it")
+
+    srv, fake = fake_openai.start(dim=a.dim, chat_latency=a.chat_latency, embed_latency=a.embed_latency,
+                                  tool_mode=a.tool_mode)
+    with tempfile.TemporaryDirectory(prefix="librarian-bench-") as td:
+        tmp = Path(td)
+        env = bench_env(tmp, srv.server_address[1], a.tts_latency, a.allow_network)
+        env["RECOMMEND_MODE"] = a.recommend_mode
+
+        ingest_s = ingest(synthetic_books(a.books), env)
+        print(f"[BENCH] ingested {a.books} books in {ingest_s:.2f}s")
+        users = seed_users(a.users, env)
+
+        port = free_port()
+        proc = start_app(port, a.workers, env)
+        try:
+            tokens = [login(port, u) for u in users]
+            results = {}
+            for s in scenarios:
+                results[s] = run_scenario(s, port, a.requests, a.concurrency, users, tokens)
+                print(f"[BENCH] {s}: {results[s]['throughput_rps']} rps, p95 {results[s]['p95_ms']}ms")
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+    srv.shutdown()
+
+    baseline = None
+    if a.compare:
+        with open(a.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_table(results, baseline)
+
+    out = Path(a.out) if a.out else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(a).items() if k not in ("out", "compare")},
+        "ingest_s": round(ingest_s, 3),
+        "openai_calls": dict(fake.calls),
+        "chat_replies": dict(fake.replies),
+        "results": results,
+    }
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[BENCH] results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
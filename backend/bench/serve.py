@@ -0,0 +1,46 @@
+# backend/bench/serve.py
+"""Run the app under uvicorn with gTTS replaced by an offline stand-in.
+
+The stand-in sleeps TTS_LATENCY seconds and emits a fixed-size payload, so
+/tts can be benchmarked without reaching Google. Everything else is the real
+app; point OPENAI_BASE_URL at bench.fake_openai for the LLM side.
+"""
+import argparse, os, sys, time, types
+
+
+class _StandInTTS:
+    def __init__(self, text, lang="en", **kwargs):
+        self.text = text
+
+    def write_to_fp(self, fp):
+        time.sleep(float(os.getenv("TTS_LATENCY", "0.2")))
+        fp.write(b"ID3" + b"\0" * (1024 + 16 * len(self.text)))
+
+
+def install_gtts_stand_in():
+    mod = types.ModuleType("gtts")
+    mod.gTTS = _StandInTTS
+    sys.modules["gtts"] = mod
+
+
+def create_app():
+    install_gtts_stand_in()
+    from app.main import app
+    return app
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Serve the app for benchmarking")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--workers", type=int, default=1)
+    a = ap.parse_args()
+
+    install_gtts_stand_in()
+    import uvicorn
+    if a.workers > 1:
+        # workers are fresh processes; they re-import this module via create_app()
+        uvicorn.run("bench.serve:create_app", factory=True, host="127.0.0.1", port=a.port,
+                    workers=a.workers, log_level="warning")
+    else:
+        from app.main import app
+        uvicorn.run(app, host="127.0.0.1", port=a.port, log_level="warning")
@@ -0,0 +1,79 @@
+# backend/bench/startup.py
+"""Cold-start benchmark: import time per app module, then warmup time per task.
+
+    cd backend
+    python -m bench.startup                # one fresh interpreter
+    python -m bench.startup --runs 5       # median over 5 fresh interpreters
+
+Each run is a new subprocess so nothing is already in sys.modules. Module
+times are incremental: a module is charged for whatever it imports first.
+"""
+import argparse, json, statistics, subprocess, sys
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+MODULES = [
+    "app.metrics", "app.intent", "app.profanity", "app.models", "app.security",
+    "app.rag", "app.tools", "app.tts", "app.emailer", "app.auth", "app.profile",
+    "app.warmup", "app.main",
+]
+
+_PROBE = """
+import importlib, json, sys, time
+out = {"imports": {}}
+t_all = time.perf_counter()
+for name in sys.argv[1:]:
+    t0 = time.perf_counter()
+    importlib.import_module(name)
+    out["imports"][name] = time.perf_counter() - t0
+out["import_total"] = time.perf_counter() - t_all
+from app import warmup
+st = warmup.run(retry=False)
+out["warmup"] = st["tasks"]
+out["warmup_total"] = st["seconds"]
+out["warmup_errors"] = st["errors"]
+print(json.dumps(out))
+"""
+
+
+def probe():
+    proc = subprocess.run([sys.executable, "-c", _PROBE, *MODULES], cwd=BACKEND_DIR,
+                          capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Import + warmup time per module")
+    ap.add_argument("--runs", type=int, default=1)
+    ap.add_argument("--out", default=None, help="results file (default bench/results/startup-<timestamp>.json)")
+    a = ap.parse_args(argv)
+
+    runs = [probe() for _ in range(a.runs)]
+    med = lambda xs: round(statistics.median(xs) * 1000, 1)
+    imports = {m: med([r["imports"][m] for r in runs]) for m in MODULES}
+    warm = {t: med([r["warmup"][t] for r in runs]) for t in runs[0]["warmup"]}
+
+    print(f"\n{'import':<16} {'ms':>8}")
+    for m, ms in imports.items():
+        print(f"{m:<16} {ms:>8}")
+    print(f"{'total':<16} {med([r['import_total'] for r in runs]):>8}")
+    print(f"\n{'warmup task':<16} {'ms':>8}")
+    for t, ms in warm.items():
+        print(f"{t:<16} {ms:>8}")
+    print(f"{'total (parallel)':<16} {med([r['warmup_total'] for r in runs]):>8}")
+    if runs[-1]["warmup_errors"]:
+        print(f"\n[BENCH] warmup errors: {runs[-1]['warmup_errors']}")
+
+    out = Path(a.out) if a.out else RESULTS_DIR / f"startup-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"created_at": datetime.now().isoformat(timespec="seconds"), "runs": a.runs,
+                   "imports_ms": imports, "warmup_ms": warm, "raw": runs}, f, indent=2)
+    print(f"\n[BENCH] results written to {out}")
+
+
+if __name__ == "__main__":
+    main()